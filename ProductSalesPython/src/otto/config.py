@@ -15,6 +15,10 @@ class Config:
             "DATABASE_URL",
             self._get_default_db_path()
         )
+        # Optional glob of SQLite shard files holding the sales table,
+        # e.g. "shards/sales_*.db". Empty means sales live in DATABASE_URL.
+        self.sales_shards: str = os.getenv("SALES_SHARDS", "")
+        self.shard_workers: int = int(os.getenv("SHARD_WORKERS", "4"))
 
         # Date range configuration
         self.start_date: str = os.getenv("START_DATE", "2025-01-01")
@@ -36,10 +40,25 @@ class Config:
             os.getenv("ENABLE_PANDERA_VALIDATION", "true")
         )
 
+        # Collect invalid rows into quarantine tables instead of failing the run
+        self.collect_validation_errors: bool = self._str_to_bool(
+            os.getenv("COLLECT_VALIDATION_ERRORS", "false")
+        )
+        self.max_error_samples: int = int(os.getenv("MAX_ERROR_SAMPLES", "10"))
+
         # Performance configuration
+        self.check_indexes: bool = self._str_to_bool(os.getenv("CHECK_INDEXES", "true"))
+        self.create_missing_indexes: bool = self._str_to_bool(
+            os.getenv("CREATE_MISSING_INDEXES", "false")
+        )
+        self.large_table_rows: int = int(os.getenv("LARGE_TABLE_ROWS", "100000"))
         self.max_retries: int = int(os.getenv("MAX_RETRIES", "3"))
         self.retry_delay: float = float(os.getenv("RETRY_DELAY", "1.0"))
 
+        # Daemon configuration
+        self.daemon_interval: float = float(os.getenv("DAEMON_INTERVAL", "60"))
+        self.daemon_trigger_file: str = os.getenv("DAEMON_TRIGGER_FILE", "")
+
         # Environment
         self.environment: str = os.getenv("ENVIRONMENT", "development")
         self.debug: bool = self._str_to_bool(os.getenv("DEBUG", "false"))
@@ -76,6 +95,22 @@ class Config:
         if self.batch_size <= 0:
             raise ValueError("BATCH_SIZE must be positive")
 
+        # Validate error collection settings
+        if self.max_error_samples < 0:
+            raise ValueError("MAX_ERROR_SAMPLES must be non-negative")
+
+        # Validate shard settings
+        if self.shard_workers <= 0:
+            raise ValueError("SHARD_WORKERS must be positive")
+
+        # Validate index check settings
+        if self.large_table_rows < 0:
+            raise ValueError("LARGE_TABLE_ROWS must be non-negative")
+
+        # Validate daemon settings
+        if self.daemon_interval <= 0:
+            raise ValueError("DAEMON_INTERVAL must be positive")
+
         # Validate retry settings
         if self.max_retries < 0:
             raise ValueError("MAX_RETRIES must be non-negative")
@@ -0,0 +1,252 @@
+"""
+Long-running daemon mode for the Otto ETL pipeline.
+Keeps products, calendar and the per-day sales aggregate in memory and
+republishes revenue after reading only the sales inserted since the last refresh.
+Invalid sales are always quarantined rather than failing the refresh.
+"""
+import os
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+import pandas as pd
+from pandera.errors import SchemaErrors
+from otto.config import config
+from otto.db_utils import get_connection, write_table, read_new_sales, sales_fingerprint, list_sales_shards, prune_shards
+from otto.etl import aggregate_sales, build_revenue
+from otto.indexes import daemon_queries
+from otto.main import SALES_COLUMNS, load_products, load_calendar, run_index_checks
+from otto.utils import clean_df, collect_invalid_rows
+from otto.schemas import sales_schema
+from otto.models import SalesRecord
+from otto.logging_config import logger
+
+
+# How often the trigger file and stop/reload flags are checked while waiting
+_POLL_SECONDS = 1.0
+
+
+class RevenueDaemon:
+    """Keeps pipeline inputs warm and refreshes the revenue table incrementally."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.products_df = None
+        self.calendar_df = None
+        self.sales_agg = None
+        # Highest sales rowid already aggregated and its sales_fingerprint, per sales database file
+        self.watermarks: dict[str, tuple[int, tuple]] = {}
+        # Sales rejected since the aggregate was last rebuilt
+        self.rejected_df = None
+        self.published = False
+        self.reload_requested = False
+        self.stop_requested = False
+
+    def load_dimensions(self) -> None:
+        """Load products and calendar and reset the in-memory sales aggregate."""
+        logger.info("Loading products and calendar into memory")
+        self.products_df = load_products(self.conn)
+        self.calendar_df = load_calendar(self.conn)
+        self._reset_sales()
+
+    def _reset_sales(self) -> None:
+        """Drop the sales aggregate so the next read starts from the first sale."""
+        self.sales_agg = pd.DataFrame({
+            'sku_id': pd.Series(dtype='int64'),
+            'date_id': pd.Series(dtype='object'),
+            'sales': pd.Series(dtype='int64'),
+        })
+        self.watermarks = {}
+        self.rejected_df = None
+        self.published = False
+
+    def _sales_sources(self) -> list[str]:
+        """Return the database files holding sales for the configured date range."""
+        if config.sales_shards:
+            shards = list_sales_shards(config.sales_shards)
+            return prune_shards(shards, config.start_date, config.end_date)
+        return [config.database_url]
+
+    def _read_source(self, db_path: str) -> tuple[str, pd.DataFrame, tuple]:
+        """
+        Read the new sales of one database file on its own connection.
+
+        Returns None instead of the new rows when the rows already read have
+        changed since the last refresh, so the aggregate must be rebuilt.
+        """
+        rowid, fingerprint = self.watermarks.get(db_path, (0, None))
+        with closing(get_connection(db_path)) as conn:
+            # Read the new rows and the new fingerprint from the same snapshot
+            conn.execute("BEGIN")
+            try:
+                if rowid and sales_fingerprint(conn, rowid, SALES_COLUMNS) != fingerprint:
+                    return db_path, None, None
+                df = read_new_sales(conn, config.start_date, config.end_date,
+                                    after_rowid=rowid, columns=SALES_COLUMNS)
+                if not df.empty:
+                    rowid = int(df['rowid'].max())
+                    fingerprint = sales_fingerprint(conn, rowid, SALES_COLUMNS)
+                return db_path, df, (rowid, fingerprint)
+            finally:
+                conn.rollback()
+
+    def _read_sources(self) -> list[tuple[str, pd.DataFrame, tuple]]:
+        """Read the new sales of every sales database file in parallel."""
+        sources = self._sales_sources()
+        if not sources:
+            return []
+        with ThreadPoolExecutor(max_workers=min(config.shard_workers, len(sources))) as executor:
+            return list(executor.map(self._read_source, sources))
+
+    def _label_rows(self, db_path: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Index new sales by rowid, prefixed with the shard path when sharded.
+
+        The index becomes the source_row of quarantined rows and the sample rows
+        in validation logs, so both point back at the row in its database file.
+        """
+        df = df.set_index('rowid')
+        if config.sales_shards:
+            df.index = [f"{db_path}:{rowid}" for rowid in df.index]
+        return df
+
+    def _validate_sales(self, sales_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Validate new sales and rewrite sales_quarantine with every row rejected since the last rebuild.
+
+        Invalid rows are quarantined whatever COLLECT_VALIDATION_ERRORS says: failing
+        instead would leave the watermark in place and fail on the same row every refresh.
+        For the same reason a batch whose failures cannot be tied to rows is quarantined whole.
+        """
+        try:
+            valid_df, rejected_df, _ = collect_invalid_rows(
+                sales_df,
+                schema=sales_schema if config.enable_pandera_validation else None,
+                Model=SalesRecord if config.enable_pydantic_validation else None,
+                max_samples=config.max_error_samples
+            )
+        except SchemaErrors as e:
+            logger.error(f"New sales failed validation as a whole, quarantining all {len(sales_df)} rows: {e}")
+            valid_df = sales_df.iloc[0:0]
+            rejected_df = sales_df.assign(source_row=sales_df.index,
+                                          rejection_reasons="batch: schema failure not tied to rows")
+        if self.rejected_df is None or not rejected_df.empty:
+            self.rejected_df = pd.concat([self.rejected_df, rejected_df], ignore_index=True)
+            write_table(self.conn, self.rejected_df, "sales_quarantine")
+        return valid_df
+
+    def refresh(self) -> int:
+        """
+        Fold newly inserted sales into the aggregate and republish revenue.
+
+        If sales already read were deleted, or the row at the watermark was replaced
+        or renumbered, the aggregate is rebuilt from all sales instead. In-place
+        updates of earlier rows are not detected and need a reload. Revenue is only rewritten when sales
+        were read or nothing has been published since the last rebuild.
+
+        Returns:
+            int: Number of sales rows read.
+        """
+        results = self._read_sources()
+        if any(df is None for _, df, _ in results):
+            logger.warning("Sales already aggregated have changed, rebuilding the sales aggregate")
+            self._reset_sales()
+            results = self._read_sources()
+
+        frames = [self._label_rows(db_path, df) for db_path, df, _ in results if not df.empty]
+        new_rows = sum(len(df) for df in frames)
+        if frames:
+            sales_df = self._validate_sales(clean_df(pd.concat(frames)))
+            if not sales_df.empty:
+                combined = pd.concat([self.sales_agg, aggregate_sales(sales_df)], ignore_index=True)
+                self.sales_agg = combined.groupby(['sku_id', 'date_id'], as_index=False)['sales'].sum()
+        for db_path, _, watermark in results:
+            self.watermarks[db_path] = watermark
+
+        if new_rows or not self.published:
+            self.publish()
+        else:
+            logger.info("No new sales, revenue left unchanged")
+        return new_rows
+
+    def publish(self) -> None:
+        """Rebuild revenue from the in-memory inputs and write it to the database."""
+        result_df = build_revenue(self.products_df, self.sales_agg, self.calendar_df)
+        write_table(self.conn, result_df, "revenue")
+        self.published = True
+        logger.info("Revenue republished", extra={"rows": len(result_df)})
+
+    def wait_for_trigger(self) -> None:
+        """
+        Wait until the refresh interval elapses, the trigger file appears or a signal arrives.
+
+        A trigger file containing "reload" also requests a reload of the dimensions.
+        """
+        deadline = time.monotonic() + config.daemon_interval
+        while not (self.stop_requested or self.reload_requested) and time.monotonic() < deadline:
+            if self._consume_trigger():
+                return
+            time.sleep(max(0.0, min(_POLL_SECONDS, deadline - time.monotonic())))
+
+    def _consume_trigger(self) -> bool:
+        """Read and remove the trigger file if present, returning whether a refresh was triggered."""
+        trigger_file = config.daemon_trigger_file
+        if not trigger_file or not os.path.exists(trigger_file):
+            return False
+        # Another process sharing the trigger file may remove it first
+        try:
+            with open(trigger_file) as f:
+                self.reload_requested = f.read().strip().lower() == "reload"
+        except FileNotFoundError:
+            return False
+        try:
+            os.remove(trigger_file)
+        except FileNotFoundError:
+            pass
+        logger.info(f"Refresh triggered by '{trigger_file}'")
+        return True
+
+    def _install_signal_handlers(self) -> None:
+        """Stop on SIGINT/SIGTERM and reload dimensions on SIGHUP where available."""
+        def request_stop(signum, frame):
+            logger.info(f"Received signal {signum}, stopping daemon")
+            self.stop_requested = True
+
+        def request_reload(signum, frame):
+            logger.info(f"Received signal {signum}, reloading dimensions")
+            self.reload_requested = True
+
+        signal.signal(signal.SIGINT, request_stop)
+        signal.signal(signal.SIGTERM, request_stop)
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, request_reload)
+
+    def run(self) -> None:
+        """Load dimensions, then refresh revenue until stopped."""
+        self._install_signal_handlers()
+        self.load_dimensions()
+        while not self.stop_requested:
+            try:
+                if self.reload_requested:
+                    self.reload_requested = False
+                    self.load_dimensions()
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Daemon refresh failed: {e}", exc_info=True)
+            self.wait_for_trigger()
+        logger.info("Daemon stopped")
+
+
+def main():
+    # Validate configuration
+    config.validate()
+    logger.info(f"Starting ETL daemon with config: {config}")
+
+    with get_connection(config.database_url) as conn:
+        if config.check_indexes:
+            run_index_checks(conn, daemon_queries(config.start_date, config.end_date, SALES_COLUMNS))
+        RevenueDaemon(conn).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,57 @@
 # db_utils.py
 
+import calendar
+import glob
+import os
+import re
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from datetime import date
 import pandas as pd
 from otto.logging_config import logger
 
+# Sales in a date range plus the rows whose orderdate_utc SQLite cannot parse (DATE() is NULL),
+# so validation still sees them; both branches match the DATE(orderdate_utc) index in sql/90_indexes.sql
+SALES_QUERY = """
+    SELECT {columns} FROM sales
+    WHERE DATE(orderdate_utc) >= ? AND DATE(orderdate_utc) <= ?{rowid_filter}
+    UNION ALL
+    SELECT {columns} FROM sales
+    WHERE DATE(orderdate_utc) IS NULL{rowid_filter}
+"""
+
+# Column types of the sales table, used to build correctly typed empty frames
+SALES_DTYPES = {'sku_id': 'int64', 'order_id': 'string', 'sales': 'int64', 'orderdate_utc': 'string'}
+
+# Queries behind sales_fingerprint
+SALES_COUNT_TO_ROWID_QUERY = "SELECT COUNT(*) FROM sales WHERE rowid <= ?"
+SALES_AT_ROWID_QUERY = "SELECT {columns} FROM sales WHERE rowid = ?"
+
+CALENDAR_QUERY = """
+    SELECT date_id FROM calendar
+    WHERE date_id >= ? AND date_id <= ?
+    ORDER BY date_id
+"""
+
+
+def sales_query(columns: list[str] = None, after_rowid: bool = False) -> str:
+    """
+    Build the sales read query.
+
+    Args:
+        columns (list[str], optional): List of columns to read. Reads all if None.
+        after_rowid (bool): Also select the rowid and only read rows above a rowid watermark.
+
+    Returns:
+        str: Query taking (start_date, end_date), or (start_date, end_date, rowid, rowid)
+        when after_rowid is set.
+    """
+    cols = '*' if columns is None else ', '.join(columns)
+    if after_rowid:
+        return SALES_QUERY.format(columns=f"rowid, {cols}", rowid_filter=" AND rowid > ?")
+    return SALES_QUERY.format(columns=cols, rowid_filter="")
+
 
 def get_connection(db_path: str) -> sqlite3.Connection:
     """
@@ -78,16 +126,197 @@ def read_calendar(conn: sqlite3.Connection, start_date: str, end_date: str) -> p
     Returns:
         pd.DataFrame: DataFrame containing calendar dates in the range.
     """
-    query = """
-        SELECT date_id FROM calendar
-        WHERE date_id >= ? AND date_id <= ?
-        ORDER BY date_id
-    """
     logger.info(f"Reading calendar from {start_date} to {end_date}")
     try:
-        df = pd.read_sql(query, conn, params=(start_date, end_date))
+        df = pd.read_sql(CALENDAR_QUERY, conn, params=(start_date, end_date))
         logger.info(f"Read {len(df)} calendar rows")
         return df
     except Exception as e:
         logger.error(f"Failed to read calendar: {e}")
         raise
+
+
+def read_sales(conn: sqlite3.Connection, start_date: str, end_date: str, columns: list[str] = None) -> pd.DataFrame:
+    """
+    Read sales with an order date within a specified range.
+
+    Rows whose order date SQLite cannot parse are read as well, so that
+    validation rejects them rather than the date filter dropping them.
+
+    Args:
+        conn (sqlite3.Connection): SQLite connection object.
+        start_date (str): Start date (inclusive).
+        end_date (str): End date (inclusive).
+        columns (list[str], optional): List of columns to read. Reads all if None.
+
+    Returns:
+        pd.DataFrame: DataFrame containing sales rows in the range.
+    """
+    logger.info(f"Reading sales from {start_date} to {end_date}")
+    try:
+        df = pd.read_sql(sales_query(columns), conn, params=(start_date, end_date))
+        logger.info(f"Read {len(df)} sales rows")
+        return df
+    except Exception as e:
+        logger.error(f"Failed to read sales: {e}")
+        raise
+
+
+def read_new_sales(conn: sqlite3.Connection, start_date: str, end_date: str,
+                   after_rowid: int = 0, columns: list[str] = None) -> pd.DataFrame:
+    """
+    Read sales within a date range that were inserted after a rowid watermark.
+
+    As in read_sales, rows whose order date SQLite cannot parse are included.
+
+    Args:
+        conn (sqlite3.Connection): SQLite connection object.
+        start_date (str): Start date (inclusive).
+        end_date (str): End date (inclusive).
+        after_rowid (int): Only rows with a greater rowid are read.
+        columns (list[str], optional): List of columns to read. Reads all if None.
+
+    Returns:
+        pd.DataFrame: DataFrame containing the new sales rows plus a 'rowid' column.
+    """
+    logger.info(f"Reading sales after rowid {after_rowid} from {start_date} to {end_date}")
+    try:
+        df = pd.read_sql(sales_query(columns, after_rowid=True), conn,
+                         params=(start_date, end_date, after_rowid, after_rowid))
+        logger.info(f"Read {len(df)} new sales rows")
+        return df
+    except Exception as e:
+        logger.error(f"Failed to read new sales: {e}")
+        raise
+
+
+def sales_fingerprint(conn: sqlite3.Connection, rowid: int, columns: list[str] = None) -> tuple:
+    """
+    Fingerprint the sales rows at or below a rowid watermark.
+
+    SQLite can hand out a rowid again once the newest row is deleted, and VACUUM
+    may renumber rowids. A changed fingerprint means rows already read were
+    deleted, or that the row at the watermark was replaced or renumbered. In-place
+    updates of other rows at or below the watermark leave it unchanged.
+
+    Args:
+        conn (sqlite3.Connection): SQLite connection object.
+        rowid (int): Rowid watermark.
+        columns (list[str], optional): Columns compared for the row at the watermark. All if None.
+
+    Returns:
+        tuple: Number of rows with a rowid at or below the watermark and the values of the row at it.
+    """
+    cols = '*' if columns is None else ', '.join(columns)
+    count = conn.execute(SALES_COUNT_TO_ROWID_QUERY, (rowid,)).fetchone()[0]
+    row = conn.execute(SALES_AT_ROWID_QUERY.format(columns=cols), (rowid,)).fetchone()
+    return count, row
+
+
+# Matches a year-month token such as "2025-01" or "2025_01" in a shard file name
+_SHARD_MONTH_RE = re.compile(r"(\d{4})[-_](\d{2})(?!\d)")
+
+
+def list_sales_shards(pattern: str) -> list[str]:
+    """
+    List the sales shard files matching a glob pattern.
+
+    Args:
+        pattern (str): Glob pattern of shard files, e.g. "shards/sales_*.db".
+
+    Returns:
+        list[str]: Sorted list of shard file paths.
+
+    Raises:
+        FileNotFoundError: If no file matches the pattern.
+    """
+    shards = sorted(glob.glob(pattern))
+    if not shards:
+        logger.error(f"No sales shards match '{pattern}'")
+        raise FileNotFoundError(f"SALES_SHARDS pattern '{pattern}' matches no files")
+    logger.info(f"Found {len(shards)} sales shards matching '{pattern}'")
+    return shards
+
+
+def prune_shards(shard_paths: list[str], start_date: str, end_date: str) -> list[str]:
+    """
+    Drop month shards that fall entirely outside a date range.
+
+    Shards whose file name carries a year-month token (e.g. "sales_2025_01.db")
+    are treated as monthly shards and kept only if that month overlaps the range.
+    Shards without such a token (e.g. SKU-hash shards) are always kept.
+
+    Args:
+        shard_paths (list[str]): Shard file paths.
+        start_date (str): Start date (inclusive), YYYY-MM-DD.
+        end_date (str): End date (inclusive), YYYY-MM-DD.
+
+    Returns:
+        list[str]: Shard file paths that may hold rows within the range.
+    """
+    start = date.fromisoformat(start_date)
+    end = date.fromisoformat(end_date)
+    kept = []
+    for path in shard_paths:
+        match = _SHARD_MONTH_RE.search(os.path.basename(path))
+        if match is None:
+            kept.append(path)
+            continue
+        year, month = int(match.group(1)), int(match.group(2))
+        if not 1 <= month <= 12:
+            kept.append(path)
+            continue
+        month_start = date(year, month, 1)
+        month_end = date(year, month, calendar.monthrange(year, month)[1])
+        if month_start <= end and month_end >= start:
+            kept.append(path)
+    logger.info(f"Pruned sales shards to {len(kept)} of {len(shard_paths)} for {start_date}..{end_date}")
+    return kept
+
+
+def _read_shard(db_path: str, start_date: str, end_date: str, columns: list[str] = None) -> pd.DataFrame:
+    """Read sales in a date range from a single shard on its own connection."""
+    with closing(get_connection(db_path)) as conn:
+        return read_sales(conn, start_date, end_date, columns=columns)
+
+
+def read_sales_shards(pattern: str, start_date: str, end_date: str,
+                      columns: list[str] = None, max_workers: int = 4) -> pd.DataFrame:
+    """
+    Read the sales table from several SQLite shard files in parallel.
+
+    Shards outside the date range are pruned first; the in-range rows of the
+    remaining shards are read concurrently, each on its own connection, and concatenated into a
+    single DataFrame so the rest of the pipeline sees one logical sales source.
+
+    Args:
+        pattern (str): Glob pattern of shard files.
+        start_date (str): Start date (inclusive), YYYY-MM-DD.
+        end_date (str): End date (inclusive), YYYY-MM-DD.
+        columns (list[str], optional): List of columns to read. Reads all if None.
+        max_workers (int): Maximum number of shards read at once.
+
+    Returns:
+        pd.DataFrame: DataFrame containing the sales rows in the range from all relevant shards.
+
+    Raises:
+        FileNotFoundError: If no file matches the pattern.
+    """
+    shards = prune_shards(list_sales_shards(pattern), start_date, end_date)
+    if not shards:
+        logger.warning(f"All sales shards matching '{pattern}' are outside {start_date}..{end_date}")
+        return pd.DataFrame({
+            column: pd.Series(dtype=SALES_DTYPES.get(column, 'string'))
+            for column in (columns or SALES_DTYPES)
+        })
+
+    logger.info(f"Reading {len(shards)} sales shards with {max_workers} workers")
+    try:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(shards))) as executor:
+            frames = list(executor.map(lambda path: _read_shard(path, start_date, end_date, columns), shards))
+        df = pd.concat(frames, ignore_index=True)
+        logger.info(f"Read {len(df)} sales rows from {len(shards)} shards")
+        return df
+    except Exception as e:
+        logger.error(f"Failed to read sales shards: {e}")
+        raise
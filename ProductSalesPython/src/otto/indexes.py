@@ -0,0 +1,198 @@
+"""
+Index advisor for the Otto ETL pipeline.
+Checks that the indexes the pipeline's queries rely on exist and that
+those queries do not fall back to full scans of large tables.
+"""
+import re
+import sqlite3
+from contextlib import closing
+from otto.db_utils import (CALENDAR_QUERY, SALES_AT_ROWID_QUERY, SALES_COUNT_TO_ROWID_QUERY, sales_query,
+                           get_connection, list_sales_shards, prune_shards)
+from otto.logging_config import logger
+
+
+# Recommended indexes, kept in step with ProductSalesSQL/sql/90_indexes.sql
+RECOMMENDED_INDEXES = {
+    "idx_sales_date": ("sales", "CREATE INDEX IF NOT EXISTS idx_sales_date ON sales (DATE(orderdate_utc))"),
+    "idx_sales_sku_date": ("sales", "CREATE INDEX IF NOT EXISTS idx_sales_sku_date ON sales (sku_id, DATE(orderdate_utc))"),
+    "idx_calendar_date": ("calendar", "CREATE INDEX IF NOT EXISTS idx_calendar_date ON calendar (date_id)"),
+    "idx_product_sku": ("product", "CREATE INDEX IF NOT EXISTS idx_product_sku ON product (sku_id)"),
+}
+
+# Matches a full table scan step such as "SCAN sales" or "SCAN TABLE sales"
+_FULL_SCAN_RE = re.compile(r"^SCAN (?:TABLE )?(\w+)$")
+
+
+def pipeline_queries(start_date: str, end_date: str, columns: list[str] = None) -> dict[str, tuple[str, str, tuple]]:
+    """
+    Build the range queries the Python pipeline issues.
+
+    Args:
+        start_date (str): Start date (inclusive).
+        end_date (str): End date (inclusive).
+        columns (list[str], optional): Sales columns read. Reads all if None.
+
+    Returns:
+        dict[str, tuple[str, str, tuple]]: Mapping of query name to (table read, query, params).
+    """
+    return {
+        "sales": ("sales", sales_query(columns), (start_date, end_date)),
+        "calendar": ("calendar", CALENDAR_QUERY, (start_date, end_date)),
+    }
+
+
+def daemon_queries(start_date: str, end_date: str, columns: list[str] = None) -> dict[str, tuple[str, str, tuple]]:
+    """
+    Build the queries the daemon issues on each refresh.
+
+    Args:
+        start_date (str): Start date (inclusive).
+        end_date (str): End date (inclusive).
+        columns (list[str], optional): Sales columns read. Reads all if None.
+
+    Returns:
+        dict[str, tuple[str, str, tuple]]: Mapping of query name to (table read, query, params).
+    """
+    cols = '*' if columns is None else ', '.join(columns)
+    return {
+        "new_sales": ("sales", sales_query(columns, after_rowid=True), (start_date, end_date, 0, 0)),
+        "sales_count_to_rowid": ("sales", SALES_COUNT_TO_ROWID_QUERY, (0,)),
+        "sales_at_rowid": ("sales", SALES_AT_ROWID_QUERY.format(columns=cols), (0,)),
+        "calendar": ("calendar", CALENDAR_QUERY, (start_date, end_date)),
+    }
+
+
+def existing_tables(conn: sqlite3.Connection) -> set[str]:
+    """Return the names of the tables in the database."""
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def existing_indexes(conn: sqlite3.Connection) -> set[str]:
+    """Return the names of the indexes in the database."""
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+
+def explain_query_plan(conn: sqlite3.Connection, query: str, params: tuple = ()) -> list[str]:
+    """
+    Run EXPLAIN QUERY PLAN on a query.
+
+    Args:
+        conn (sqlite3.Connection): SQLite connection object.
+        query (str): Query to explain.
+        params (tuple): Query parameters.
+
+    Returns:
+        list[str]: The detail text of each plan step.
+    """
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+
+
+def full_scans(plan: list[str]) -> list[str]:
+    """Return the tables a query plan reads with a full scan."""
+    return [match.group(1) for match in map(_FULL_SCAN_RE.match, plan) if match]
+
+
+def estimate_rows(conn: sqlite3.Connection, table: str) -> int:
+    """
+    Estimate a table's row count without scanning it.
+
+    Uses the ANALYZE statistics in sqlite_stat1 when present, otherwise MAX(rowid),
+    which SQLite answers from the end of the table's B-tree.
+
+    Args:
+        conn (sqlite3.Connection): SQLite connection object.
+        table (str): Name of the table.
+
+    Returns:
+        int: Estimated number of rows.
+    """
+    if "sqlite_stat1" in existing_tables(conn):
+        row = conn.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = ? ORDER BY idx IS NOT NULL LIMIT 1", (table,)).fetchone()
+        if row is not None:
+            return int(row[0].split()[0])
+    try:
+        return conn.execute(f"SELECT MAX(rowid) FROM {table}").fetchone()[0] or 0
+    except sqlite3.OperationalError:
+        # WITHOUT ROWID tables have no rowid to look up
+        return 0
+
+
+def check_indexes(conn: sqlite3.Connection, queries: dict[str, tuple[str, str, tuple]],
+                  create_missing: bool = False, large_table_rows: int = 100000) -> dict[str, list[str]]:
+    """
+    Check recommended indexes and the query plans of the pipeline's queries.
+
+    Missing recommended indexes are logged and, if requested, created. Each
+    query is then explained and a warning is logged for every full scan of a
+    table holding at least ``large_table_rows`` rows. Tables that do not exist
+    in this database are skipped.
+
+    Args:
+        conn (sqlite3.Connection): SQLite connection object.
+        queries (dict[str, tuple[str, str, tuple]]): Mapping of query name to (table read, query, params).
+        create_missing (bool): Create missing recommended indexes.
+        large_table_rows (int): Row count from which a full scan is reported.
+
+    Returns:
+        dict[str, list[str]]: Lists of "missing" and "created" index names
+        and of "full_scans" as table names.
+    """
+    logger.info("Checking database indexes and query plans")
+    tables = existing_tables(conn)
+    indexes = existing_indexes(conn)
+    report = {"missing": [], "created": [], "full_scans": []}
+
+    for name, (table, ddl) in RECOMMENDED_INDEXES.items():
+        if table not in tables or name in indexes:
+            continue
+        report["missing"].append(name)
+        if create_missing:
+            logger.info(f"Creating missing index '{name}' on '{table}'")
+            conn.execute(ddl)
+            report["created"].append(name)
+        else:
+            logger.warning(f"Recommended index '{name}' on '{table}' is missing")
+    if report["created"]:
+        conn.commit()
+
+    for name, (table, query, params) in queries.items():
+        if table not in tables:
+            continue
+        for scanned in dict.fromkeys(full_scans(explain_query_plan(conn, query, params))):
+            rows = estimate_rows(conn, scanned)
+            if rows >= large_table_rows:
+                logger.warning(f"Query '{name}' does a full scan of '{scanned}' (~{rows} rows)")
+                report["full_scans"].append(scanned)
+
+    logger.info(f"Index check complete: {len(report['missing'])} missing, "
+                f"{len(report['created'])} created, {len(report['full_scans'])} full scans")
+    return report
+
+
+def check_shard_indexes(pattern: str, start_date: str, end_date: str, queries: dict[str, tuple[str, str, tuple]],
+                        create_missing: bool = False, large_table_rows: int = 100000) -> dict[str, dict[str, list[str]]]:
+    """
+    Check indexes and the sales query plans on each sales shard in a date range.
+
+    Each shard is checked on its own connection, the same way shards are read.
+
+    Args:
+        pattern (str): Glob pattern of shard files.
+        start_date (str): Start date (inclusive).
+        end_date (str): End date (inclusive).
+        queries (dict[str, tuple[str, str, tuple]]): Mapping of query name to (table read, query, params);
+            only the queries on sales are planned.
+        create_missing (bool): Create missing recommended indexes.
+        large_table_rows (int): Row count from which a full scan is reported.
+
+    Returns:
+        dict[str, dict[str, list[str]]]: Mapping of shard path to its check_indexes report.
+    """
+    sales_queries = {name: query for name, query in queries.items() if query[0] == "sales"}
+    reports = {}
+    for path in prune_shards(list_sales_shards(pattern), start_date, end_date):
+        logger.info(f"Checking indexes on sales shard '{path}'")
+        with closing(get_connection(path)) as conn:
+            reports[path] = check_indexes(conn, sales_queries, create_missing=create_missing,
+                                          large_table_rows=large_table_rows)
+    return reports
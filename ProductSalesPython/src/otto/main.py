@@ -1,12 +1,88 @@
+import pandas as pd
 from otto.config import config
-from otto.db_utils import get_connection, read_table, write_table, read_calendar
+from otto.db_utils import get_connection, read_table, write_table, read_calendar, read_sales, read_sales_shards
+from otto.indexes import check_indexes, check_shard_indexes, pipeline_queries
 from otto.etl import run_etl
-from otto.utils import clean_df, validate_df_with_model
+from otto.utils import clean_df, validate_df_with_model, quarantine_invalid_rows
 from otto.schemas import product_schema, sales_schema
 from otto.models import Product, SalesRecord
 from otto.logging_config import logger
 
 
+SALES_COLUMNS = ['sku_id', 'order_id', 'sales', 'orderdate_utc']
+
+
+def validate_frame(conn, df, table_name, schema, Model):
+    """
+    Validate a cleaned input DataFrame according to the configured validation mode.
+
+    Args:
+        conn (sqlite3.Connection): SQLite connection object, used for quarantine tables.
+        df (pd.DataFrame): DataFrame to validate.
+        table_name (str): Name of the source table.
+        schema (pa.DataFrameSchema): Pandera schema for the table.
+        Model: Pydantic model class for the table rows.
+
+    Returns:
+        pd.DataFrame: The rows that passed validation.
+    """
+    if config.collect_validation_errors:
+        logger.info(f"Validating {table_name} data, quarantining invalid rows")
+        return quarantine_invalid_rows(
+            conn, df, table_name,
+            schema=schema if config.enable_pandera_validation else None,
+            Model=Model if config.enable_pydantic_validation else None,
+            max_samples=config.max_error_samples
+        )
+
+    if config.enable_pandera_validation:
+        logger.info(f"Validating {table_name} schema with Pandera")
+        schema.validate(df, lazy=True)
+
+    if config.enable_pydantic_validation:
+        logger.info(f"Validating {table_name} rows with Pydantic")
+        validate_df_with_model(df, Model)
+    return df
+
+
+def load_products(conn):
+    """Read, clean and validate the product table."""
+    products_df = read_table(conn, "product", columns=['sku_id', 'sku_description', 'price'])
+    return validate_frame(conn, clean_df(products_df), "product", product_schema, Product)
+
+
+def load_calendar(conn):
+    """Read the calendar for the configured date range, generating it if the table is empty."""
+    calendar_df = read_calendar(conn, config.start_date, config.end_date)
+
+    # Generate calendar if table is empty
+    if len(calendar_df) == 0:
+        logger.warning("Calendar table is empty, generating date range dynamically")
+        date_range = pd.date_range(start=config.start_date, end=config.end_date, freq='D')
+        calendar_df = pd.DataFrame({'date_id': date_range.date})
+        logger.info(f"Generated {len(calendar_df)} calendar dates")
+    return calendar_df
+
+
+def run_index_checks(conn, queries=None):
+    """
+    Check indexes and query plans on the main database and on any sales shards.
+
+    Args:
+        conn (sqlite3.Connection): SQLite connection object for DATABASE_URL.
+        queries (dict, optional): Queries to plan, as built by otto.indexes.
+            Defaults to the batch pipeline's queries.
+    """
+    if queries is None:
+        queries = pipeline_queries(config.start_date, config.end_date, SALES_COLUMNS)
+    check_indexes(conn, queries, create_missing=config.create_missing_indexes,
+                  large_table_rows=config.large_table_rows)
+    if config.sales_shards:
+        check_shard_indexes(config.sales_shards, config.start_date, config.end_date, queries,
+                            create_missing=config.create_missing_indexes,
+                            large_table_rows=config.large_table_rows)
+
+
 def main():
     # Validate configuration
     config.validate()
@@ -14,31 +90,18 @@ def main():
 
     try:
         with get_connection(config.database_url) as conn:
-            products_df = read_table(conn, "product", columns=['sku_id', 'sku_description', 'price'])
-            sales_df = read_table(conn, "sales", columns=['sku_id', 'order_id', 'sales', 'orderdate_utc'])
-            calendar_df = read_calendar(conn, config.start_date, config.end_date)
-
-            # Generate calendar if table is empty
-            if len(calendar_df) == 0:
-                logger.warning("Calendar table is empty, generating date range dynamically")
-                import pandas as pd
-                date_range = pd.date_range(start=config.start_date, end=config.end_date, freq='D')
-                calendar_df = pd.DataFrame({'date_id': date_range.date})
-                logger.info(f"Generated {len(calendar_df)} calendar dates")
-
-            logger.info("Cleaning product and sales data")
-            products_df = clean_df(products_df)
-            sales_df = clean_df(sales_df)
-
-            if config.enable_pandera_validation:
-                logger.info("Validating product and sales schemas with Pandera")
-                product_schema.validate(products_df, lazy=True)
-                sales_schema.validate(sales_df, lazy=True)
-
-            if config.enable_pydantic_validation:
-                logger.info("Validating product and sales rows with Pydantic")
-                validate_df_with_model(products_df, Product)
-                validate_df_with_model(sales_df, SalesRecord)
+            if config.check_indexes:
+                run_index_checks(conn)
+
+            products_df = load_products(conn)
+            if config.sales_shards:
+                sales_df = read_sales_shards(config.sales_shards, config.start_date, config.end_date,
+                                             columns=SALES_COLUMNS, max_workers=config.shard_workers)
+            else:
+                sales_df = read_sales(conn, config.start_date, config.end_date, columns=SALES_COLUMNS)
+            calendar_df = load_calendar(conn)
+
+            sales_df = validate_frame(conn, clean_df(sales_df), "sales", sales_schema, SalesRecord)
 
             logger.info("Running ETL transformation")
             result_df = run_etl(products_df, sales_df, calendar_df)
@@ -1,7 +1,6 @@
 
 from pydantic import BaseModel, Field, field_validator
 from datetime import date
-from otto.logging_config import logger
 
 
 class Product(BaseModel):
@@ -13,7 +12,6 @@ class Product(BaseModel):
     @classmethod
     def sku_id_must_be_positive(cls, v):
         if v <= 0:
-            logger.error("sku_id must be positive")
             raise ValueError("sku_id must be positive")
         return v
 
@@ -28,7 +26,6 @@ class SalesRecord(BaseModel):
     @classmethod
     def order_id_not_empty(cls, v):
         if not v.strip():
-            logger.error("order_id must not be empty")
             raise ValueError("order_id must not be empty")
         return v
 
@@ -36,7 +33,6 @@ class SalesRecord(BaseModel):
     @classmethod
     def sku_id_must_be_positive(cls, v):
         if v <= 0:
-            logger.error("sku_id must be positive")
             raise ValueError("sku_id must be positive")
         return v
 
@@ -52,7 +48,6 @@ class RevenueRow(BaseModel):
     @classmethod
     def sku_id_must_be_positive(cls, v):
         if v <= 0:
-            logger.error("sku_id must be positive")
             raise ValueError("sku_id must be positive")
         return v
 
@@ -1,4 +1,5 @@
 
+import pandas as pd
 import pandera.pandas as pa
 from otto.logging_config import logger
 
@@ -25,7 +26,15 @@ sales_schema = pa.DataFrameSchema({
     "sku_id": pa.Column(pa.Int, nullable=False),
     "order_id": pa.Column(pa.String, nullable=False),
     "sales": pa.Column(pa.Int, checks=pa.Check.ge(0), nullable=False),
-    "orderdate_utc": pa.Column(pa.String, nullable=False),
+    "orderdate_utc": pa.Column(
+        pa.String,
+        checks=pa.Check(
+            lambda s: pd.to_datetime(s, errors="coerce", format="mixed").notna(),
+            name="parseable_date",
+            error="orderdate_utc must be a parseable date",
+        ),
+        nullable=False,
+    ),
 })
 
 
@@ -1,4 +1,8 @@
 
+import pandas as pd
+from pandera.errors import SchemaErrors
+from pydantic import TypeAdapter, ValidationError
+from otto.db_utils import write_table
 from otto.logging_config import logger
 
 
@@ -42,3 +46,152 @@ def clean_df(df):
     except Exception as e:
         logger.error(f"Data cleaning failed: {e}", exc_info=True)
         raise
+
+
+def _plain_label(label):
+    """Turn a numpy index scalar into the matching Python value so it logs and stores cleanly."""
+    return label.item() if hasattr(label, "item") else label
+
+
+def _summarize_failures(failures, max_samples):
+    """Group (row index, column, rule) failures into counted violations with capped samples."""
+    violations = {}
+    for index, column, rule in failures:
+        violation = violations.setdefault((rule, column), {
+            "rule": rule, "column": column, "count": 0, "sample_rows": []
+        })
+        violation["count"] += 1
+        if len(violation["sample_rows"]) < max_samples:
+            violation["sample_rows"].append(index)
+    return list(violations.values())
+
+
+def _check_numeric_columns(df, schema):
+    """
+    Find rows whose values do not fit the numeric columns of a schema and cast the other rows.
+
+    A single fractional or non-numeric value makes Pandera fail a whole integer column
+    on its dtype, which cannot be tied to rows; checking the values here lets those rows
+    be rejected and the rest validated with the schema's dtype.
+
+    Args:
+        df (pd.DataFrame): DataFrame to check.
+        schema (pa.DataFrameSchema): Pandera schema.
+
+    Returns:
+        tuple: (failures, checked_df). failures is a list of (row index, column, rule);
+        checked_df holds the other rows with numeric columns cast to their schema dtype.
+    """
+    failures = []
+    casts = {}
+    for name, column in schema.columns.items():
+        dtype = str(column.dtype)
+        numeric = pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_float_dtype(dtype)
+        if name not in df.columns or not numeric or str(df[name].dtype) == dtype:
+            continue
+        values = pd.to_numeric(df[name], errors="coerce")
+        bad = df[name].notna() & values.isna()
+        if pd.api.types.is_integer_dtype(dtype):
+            bad |= values.notna() & (values % 1 != 0)
+        failures.extend((index, name, f"dtype('{dtype}')") for index in df.index[bad].tolist())
+        if not column.nullable:
+            failures.extend((index, name, "not_nullable") for index in df.index[df[name].isna()].tolist())
+        casts[name] = dtype
+
+    checked_df = df[~df.index.isin([index for index, _, _ in failures])].copy()
+    for name, dtype in casts.items():
+        values = pd.to_numeric(checked_df[name])
+        # Nulls left in nullable columns keep the column from being cast
+        if not values.isna().any():
+            checked_df[name] = values.astype(dtype)
+    return failures, checked_df
+
+
+def collect_invalid_rows(df, schema=None, Model=None, max_samples=10):
+    """
+    Validate a DataFrame and separate invalid rows instead of failing on the first one.
+
+    Rows failing the Pandera schema are collected first, including rows whose values
+    do not fit a numeric column's dtype; the remaining rows are then validated with
+    the Pydantic model in a single batch. Failures are grouped
+    by rule and column, with at most ``max_samples`` row indices kept per group.
+
+    Args:
+        df (pd.DataFrame): DataFrame to validate.
+        schema (pa.DataFrameSchema, optional): Pandera schema. Skipped if None.
+        Model (optional): Pydantic model class. Skipped if None.
+        max_samples (int): Maximum number of sample row indices kept per violation.
+
+    Returns:
+        tuple: (valid_df, rejected_df, violations). valid_df has numeric columns cast to
+        their schema dtype; rejected_df holds the invalid rows as they were in df,
+        with ``source_row`` (its index in df) and ``rejection_reasons`` columns; violations is a list of dicts with
+        ``rule``, ``column``, ``count`` and ``sample_rows`` keys.
+
+    Raises:
+        SchemaErrors: If a schema failure cannot be tied to rows (e.g. a missing column).
+    """
+    logger.info(f"Collecting validation errors, rows: {len(df)}")
+    failures = []
+    checked_df = df
+
+    if schema is not None:
+        failures, checked_df = _check_numeric_columns(df, schema)
+        try:
+            schema.validate(checked_df, lazy=True)
+        except SchemaErrors as e:
+            cases = e.failure_cases
+            if cases["index"].isna().any():
+                logger.error(f"Schema validation failed at DataFrame level: {e}")
+                raise
+            failures.extend(zip(map(_plain_label, cases["index"]), cases["column"], cases["check"].astype(str)))
+
+    if Model is not None:
+        candidates = checked_df[~checked_df.index.isin([index for index, _, _ in failures])]
+        try:
+            TypeAdapter(list[Model]).validate_python(candidates.to_dict(orient="records"))
+        except ValidationError as e:
+            for error in e.errors(include_url=False):
+                position, *field = error["loc"]
+                failures.append((_plain_label(candidates.index[position]), field[0] if field else None, error["msg"]))
+
+    reasons = {}
+    for index, column, rule in failures:
+        reasons.setdefault(index, []).append(f"{column}: {rule}")
+    rejected_mask = df.index.isin(list(reasons))
+    valid_df = checked_df[~checked_df.index.isin(list(reasons))]
+    rejected_df = df[rejected_mask].copy()
+    rejected_df["source_row"] = rejected_df.index
+    rejected_df["rejection_reasons"] = ["; ".join(dict.fromkeys(reasons[index])) for index in rejected_df.index]
+
+    violations = _summarize_failures(failures, max_samples)
+    for violation in violations:
+        logger.warning(
+            f"{violation['count']} rows failed '{violation['rule']}' on column '{violation['column']}', "
+            f"sample rows: {violation['sample_rows']}"
+        )
+    logger.info(f"Validation collected {len(rejected_df)} rejected rows, {len(valid_df)} valid rows")
+    return valid_df, rejected_df, violations
+
+
+def quarantine_invalid_rows(conn, df, table_name, schema=None, Model=None, max_samples=10):
+    """
+    Validate a DataFrame, write its invalid rows to a quarantine table and return the valid rows.
+
+    The rejected rows are written in one batch to ``<table_name>_quarantine``,
+    replacing the previous run's quarantine.
+
+    Args:
+        conn (sqlite3.Connection): SQLite connection object.
+        df (pd.DataFrame): DataFrame to validate.
+        table_name (str): Name of the source table, used to name the quarantine table.
+        schema (pa.DataFrameSchema, optional): Pandera schema. Skipped if None.
+        Model (optional): Pydantic model class. Skipped if None.
+        max_samples (int): Maximum number of sample row indices kept per violation.
+
+    Returns:
+        pd.DataFrame: The valid rows.
+    """
+    valid_df, rejected_df, _ = collect_invalid_rows(df, schema=schema, Model=Model, max_samples=max_samples)
+    write_table(conn, rejected_df, f"{table_name}_quarantine")
+    return valid_df
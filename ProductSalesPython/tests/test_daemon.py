@@ -0,0 +1,155 @@
+import sqlite3
+import pandas as pd
+import pytest
+from pandera.errors import SchemaErrors
+from otto.config import config
+from otto.daemon import RevenueDaemon
+from otto.schemas import sales_schema
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    db_path = str(tmp_path / 'sales.db')
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE product (sku_id INTEGER, sku_description TEXT, price REAL)")
+    conn.execute("INSERT INTO product VALUES (1, 'foo', 10.0), (2, 'bar', 20.0)")
+    conn.execute("CREATE TABLE calendar (date_id DATE)")
+    conn.executemany("INSERT INTO calendar VALUES (?)", [('2025-01-01',), ('2025-01-02',)])
+    conn.execute("CREATE TABLE sales (sku_id INTEGER, order_id TEXT, sales INTEGER, orderdate_utc TEXT)")
+    conn.execute("INSERT INTO sales VALUES (1, 'O1', 2, '2025-01-01 09:00:00')")
+    conn.commit()
+
+    monkeypatch.setattr(config, 'database_url', db_path)
+    monkeypatch.setattr(config, 'sales_shards', '')
+    monkeypatch.setattr(config, 'start_date', '2025-01-01')
+    monkeypatch.setattr(config, 'end_date', '2025-01-02')
+    daemon = RevenueDaemon(conn)
+    daemon.load_dimensions()
+    yield daemon
+    conn.close()
+
+
+def _revenue(conn, sku_id, date_id):
+    query = "SELECT revenue FROM revenue WHERE sku_id = ? AND date_id = ?"
+    return pd.read_sql(query, conn, params=(sku_id, date_id))['revenue'].iloc[0]
+
+
+def test_refresh_reads_only_new_sales(daemon):
+    assert daemon.refresh() == 1
+    assert _revenue(daemon.conn, 1, '2025-01-01') == 20.0
+
+    daemon.conn.execute("INSERT INTO sales VALUES (1, 'O2', 3, '2025-01-01 12:00:00'), (2, 'O3', 1, '2025-01-02 08:00:00')")
+    daemon.conn.commit()
+    assert daemon.refresh() == 2
+    assert _revenue(daemon.conn, 1, '2025-01-01') == 50.0
+    assert _revenue(daemon.conn, 2, '2025-01-02') == 20.0
+
+    assert daemon.refresh() == 0
+
+
+def test_wait_for_trigger_file_requests_reload(daemon, tmp_path, monkeypatch):
+    trigger = tmp_path / 'refresh.trigger'
+    trigger.write_text('reload')
+    monkeypatch.setattr(config, 'daemon_interval', 60.0)
+    monkeypatch.setattr(config, 'daemon_trigger_file', str(trigger))
+
+    daemon.wait_for_trigger()
+    assert daemon.reload_requested is True
+    assert not trigger.exists()
+
+
+def test_refresh_rebuilds_when_newest_sale_is_replaced(daemon):
+    daemon.conn.execute("INSERT INTO sales VALUES (2, 'O2', 1, '2025-01-02 08:00:00')")
+    daemon.conn.commit()
+    daemon.refresh()
+
+    # The replacement reuses the deleted row's rowid
+    daemon.conn.execute("DELETE FROM sales WHERE order_id = 'O2'")
+    daemon.conn.execute("INSERT INTO sales VALUES (1, 'O3', 4, '2025-01-02 09:00:00')")
+    daemon.conn.commit()
+    assert daemon.refresh() == 2
+    assert _revenue(daemon.conn, 2, '2025-01-02') == 0.0
+    assert _revenue(daemon.conn, 1, '2025-01-02') == 40.0
+
+
+def test_refresh_keeps_earlier_quarantined_sales(daemon):
+    daemon.conn.execute("INSERT INTO sales VALUES (0, 'O2', 1, '2025-01-02 08:00:00')")
+    daemon.conn.commit()
+    daemon.refresh()
+
+    daemon.conn.execute("INSERT INTO sales VALUES (2, 'O3', 1, '2025-01-02 09:00:00')")
+    daemon.conn.commit()
+    assert daemon.refresh() == 1
+    quarantined = pd.read_sql("SELECT * FROM sales_quarantine", daemon.conn)
+    assert list(quarantined['order_id']) == ['O2']
+    assert _revenue(daemon.conn, 2, '2025-01-02') == 20.0
+
+
+def test_wait_for_trigger_survives_trigger_file_removed_by_another_process(daemon, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'daemon_interval', 0.2)
+    monkeypatch.setattr(config, 'daemon_trigger_file', str(tmp_path / 'gone.trigger'))
+    monkeypatch.setattr('otto.daemon.os.path.exists', lambda path: True)
+
+    daemon.wait_for_trigger()
+    assert daemon.reload_requested is False
+
+
+def test_refresh_quarantines_fractional_sales_and_keeps_going(daemon):
+    daemon.refresh()
+    daemon.conn.execute("INSERT INTO sales VALUES (2, 'O2', 1.5, '2025-01-02 08:00:00')")
+    daemon.conn.commit()
+    assert daemon.refresh() == 1
+
+    daemon.conn.execute("INSERT INTO sales VALUES (2, 'O3', 2, '2025-01-02'), (2, 'O4', 1, '2025-01-02 09:00:00')")
+    daemon.conn.commit()
+    assert daemon.refresh() == 2
+    assert _revenue(daemon.conn, 2, '2025-01-02') == 60.0
+    quarantined = pd.read_sql("SELECT * FROM sales_quarantine", daemon.conn)
+    assert list(quarantined['order_id']) == ['O2']
+
+
+def test_refresh_quarantines_batch_failing_as_a_whole(daemon, monkeypatch):
+    try:
+        sales_schema.validate(pd.DataFrame({'sku_id': [1]}), lazy=True)
+    except SchemaErrors as e:
+        error = e
+
+    def raise_batch_error(*args, **kwargs):
+        raise error
+
+    with monkeypatch.context() as patch:
+        patch.setattr('otto.daemon.collect_invalid_rows', raise_batch_error)
+        assert daemon.refresh() == 1
+
+    daemon.conn.execute("INSERT INTO sales VALUES (2, 'O2', 1, '2025-01-02 08:00:00')")
+    daemon.conn.commit()
+    assert daemon.refresh() == 1
+    assert _revenue(daemon.conn, 1, '2025-01-01') == 0.0
+    assert _revenue(daemon.conn, 2, '2025-01-02') == 20.0
+    quarantined = pd.read_sql("SELECT * FROM sales_quarantine", daemon.conn)
+    assert list(quarantined['order_id']) == ['O1']
+
+
+def test_quarantined_sales_point_at_their_rowid(daemon):
+    daemon.refresh()
+    cursor = daemon.conn.execute("INSERT INTO sales VALUES (0, 'O2', 1, '2025-01-02 08:00:00')")
+    daemon.conn.commit()
+    daemon.refresh()
+
+    quarantined = pd.read_sql("SELECT * FROM sales_quarantine", daemon.conn)
+    assert list(quarantined['source_row']) == [cursor.lastrowid]
+
+
+def test_quarantined_shard_sales_point_at_shard_and_rowid(daemon, tmp_path, monkeypatch):
+    shard = tmp_path / 'sales_2025_01.db'
+    conn = sqlite3.connect(shard)
+    conn.execute("CREATE TABLE sales (sku_id INTEGER, order_id TEXT, sales INTEGER, orderdate_utc TEXT)")
+    conn.execute("INSERT INTO sales VALUES (1, 'S1', 1, '2025-01-01 09:00:00'), (0, 'S2', 1, '2025-01-01 10:00:00')")
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(config, 'sales_shards', str(tmp_path / 'sales_*.db'))
+
+    assert daemon.refresh() == 2
+    quarantined = pd.read_sql("SELECT * FROM sales_quarantine", daemon.conn)
+    assert list(quarantined['source_row']) == [f"{shard}:2"]
+    assert _revenue(daemon.conn, 1, '2025-01-01') == 10.0
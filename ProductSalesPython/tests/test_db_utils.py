@@ -0,0 +1,47 @@
+import sqlite3
+import pandas as pd
+import pytest
+from otto.db_utils import prune_shards, read_sales, read_sales_shards
+from otto.schemas import sales_schema
+
+
+def _make_shard(path, rows):
+    conn = sqlite3.connect(path)
+    pd.DataFrame(rows, columns=['sku_id', 'order_id', 'sales', 'orderdate_utc']).to_sql('sales', conn, index=False)
+    conn.close()
+
+
+def test_prune_shards_drops_months_outside_range():
+    shards = ['s/sales_2024_12.db', 's/sales_2025-01.db', 's/sales_2025_02.db', 's/sales_hash_3.db']
+    kept = prune_shards(shards, '2025-01-15', '2025-01-31')
+    assert kept == ['s/sales_2025-01.db', 's/sales_hash_3.db']
+
+
+def test_read_sales_shards_combines_relevant_shards(tmp_path):
+    _make_shard(tmp_path / 'sales_2025_01.db', [(1, 'O1', 2, '2025-01-01'), (2, 'O2', 1, '2025-01-20')])
+    _make_shard(tmp_path / 'sales_2025_02.db', [(1, 'O3', 4, '2025-02-01')])
+    _make_shard(tmp_path / 'sales_2025_03.db', [(1, 'O4', 9, '2025-03-01')])
+
+    df = read_sales_shards(str(tmp_path / 'sales_*.db'), '2025-01-01', '2025-02-28', max_workers=2)
+    assert sorted(df['order_id']) == ['O1', 'O2', 'O3']
+
+
+def test_read_sales_shards_no_match_raises(tmp_path):
+    with pytest.raises(FileNotFoundError, match="matches no files"):
+        read_sales_shards(str(tmp_path / 'missing_*.db'), '2025-01-01', '2025-01-31')
+
+
+def test_read_sales_shards_all_pruned_returns_typed_empty(tmp_path):
+    _make_shard(tmp_path / 'sales_2025_03.db', [(1, 'O4', 9, '2025-03-01')])
+    df = read_sales_shards(str(tmp_path / 'sales_*.db'), '2025-01-01', '2025-01-31',
+                           columns=['sku_id', 'order_id', 'sales', 'orderdate_utc'])
+    assert df.empty
+    assert list(df.columns) == ['sku_id', 'order_id', 'sales', 'orderdate_utc']
+    sales_schema.validate(df)
+
+
+def test_read_sales_includes_unparseable_dates(tmp_path):
+    _make_shard(tmp_path / 'sales.db', [(1, 'O1', 2, '2025-01-01'), (1, 'O2', 1, '2025-02-01'), (2, 'O3', 1, 'garbage')])
+    conn = sqlite3.connect(tmp_path / 'sales.db')
+    df = read_sales(conn, '2025-01-01', '2025-01-31')
+    assert sorted(df['order_id']) == ['O1', 'O3']
@@ -0,0 +1,72 @@
+import sqlite3
+from otto.indexes import (check_indexes, check_shard_indexes, daemon_queries, estimate_rows, existing_indexes,
+                          explain_query_plan, full_scans, pipeline_queries)
+
+
+def _make_db(sales_rows=0):
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE sales (sku_id INTEGER, order_id TEXT, sales INTEGER, orderdate_utc TEXT)")
+    conn.execute("CREATE TABLE calendar (date_id DATE)")
+    conn.executemany("INSERT INTO sales VALUES (?, ?, ?, ?)",
+                     [(1, f"O{i}", 1, '2025-01-01 10:00:00') for i in range(sales_rows)])
+    return conn
+
+
+def test_full_scans_parses_plan_details():
+    plan = ['SCAN sales', 'SCAN TABLE calendar', 'SEARCH sales USING INDEX idx_sales_date (<expr>>? AND <expr><?)',
+            'SCAN calendar USING COVERING INDEX idx_calendar_date']
+    assert full_scans(plan) == ['sales', 'calendar']
+
+
+def test_check_indexes_warns_without_creating():
+    conn = _make_db(sales_rows=5)
+    queries = pipeline_queries('2025-01-01', '2025-01-31')
+    report = check_indexes(conn, queries, large_table_rows=5)
+
+    assert report['missing'] == ['idx_sales_date', 'idx_sales_sku_date', 'idx_calendar_date']
+    assert report['created'] == []
+    assert 'sales' in report['full_scans']
+    assert 'idx_sales_date' not in existing_indexes(conn)
+
+
+def test_check_indexes_creates_missing_and_sales_query_uses_index():
+    conn = _make_db(sales_rows=5)
+    queries = pipeline_queries('2025-01-01', '2025-01-31')
+    report = check_indexes(conn, queries, create_missing=True, large_table_rows=5)
+
+    assert 'idx_sales_date' in report['created']
+    assert report['full_scans'] == []
+    _, query, params = queries['sales']
+    assert full_scans(explain_query_plan(conn, query, params)) == []
+
+
+def test_estimate_rows_uses_max_rowid_and_stat1():
+    conn = _make_db(sales_rows=7)
+    assert estimate_rows(conn, 'sales') == 7
+    conn.execute("CREATE INDEX idx_sales_date ON sales (DATE(orderdate_utc))")
+    conn.execute("ANALYZE")
+    conn.execute("DELETE FROM sales WHERE rowid > 3")
+    assert estimate_rows(conn, 'sales') == 7
+
+
+def test_check_shard_indexes_creates_index_on_each_shard(tmp_path):
+    for month in ('2025_01', '2025_02'):
+        conn = sqlite3.connect(tmp_path / f'sales_{month}.db')
+        conn.execute("CREATE TABLE sales (sku_id INTEGER, order_id TEXT, sales INTEGER, orderdate_utc TEXT)")
+        conn.close()
+
+    queries = pipeline_queries('2025-01-01', '2025-01-31')
+    reports = check_shard_indexes(str(tmp_path / 'sales_*.db'), '2025-01-01', '2025-01-31', queries, create_missing=True)
+    assert list(reports) == [str(tmp_path / 'sales_2025_01.db')]
+    assert 'idx_sales_date' in reports[str(tmp_path / 'sales_2025_01.db')]['created']
+    assert 'idx_sales_date' not in existing_indexes(sqlite3.connect(tmp_path / 'sales_2025_02.db'))
+
+
+def test_daemon_queries_use_indexes_once_created():
+    conn = _make_db(sales_rows=5)
+    queries = daemon_queries('2025-01-01', '2025-01-31')
+    report = check_indexes(conn, queries, create_missing=True, large_table_rows=5)
+
+    assert report['full_scans'] == []
+    for table, query, params in queries.values():
+        assert full_scans(explain_query_plan(conn, query, params)) == []
@@ -41,3 +41,9 @@ def test_revenue_schema_rejects_negative_sales():
     })
     with pytest.raises(Exception):
         revenue_schema.validate(df)
+
+
+def test_sales_schema_rejects_unparseable_date():
+    df = pd.DataFrame({'sku_id': [1], 'order_id': ['O1'], 'sales': [1], 'orderdate_utc': ['garbage']})
+    with pytest.raises(Exception):
+        sales_schema.validate(df)
@@ -1,5 +1,8 @@
+import sqlite3
 import pandas as pd
-from otto.utils import clean_df
+from otto.models import Product, SalesRecord
+from otto.schemas import sales_schema
+from otto.utils import clean_df, collect_invalid_rows, quarantine_invalid_rows
 
 
 def test_clean_df_na_and_blank_to_none():
@@ -13,3 +16,49 @@ def test_clean_df_na_and_blank_to_none():
     assert cleaned.isnull().iloc[2, 1]    # "N/A"
     assert cleaned.isnull().iloc[3, 0]    # ""
     assert cleaned.iloc[0, 0] == "A"      # good value remains
+
+
+def test_collect_invalid_rows_keeps_good_rows_and_caps_samples():
+    df = pd.DataFrame({
+        "sku_id": [1, 0, 0, 0, 2],
+        "order_id": ["O1", "O2", "O3", "O4", " "],
+        "sales": [1, 1, 1, 1, -1],
+        "orderdate_utc": ["2025-01-01"] * 5
+    })
+    valid, rejected, violations = collect_invalid_rows(df, schema=sales_schema, Model=SalesRecord, max_samples=2)
+
+    assert list(valid["order_id"]) == ["O1"]
+    assert list(rejected.index) == [1, 2, 3, 4]
+    assert "sales: greater_than_or_equal_to(0)" in rejected.loc[4, "rejection_reasons"]
+    sku = next(v for v in violations if v["column"] == "sku_id")
+    assert sku["count"] == 3
+    assert sku["sample_rows"] == [1, 2]
+    assert all(type(index) is int for index in sku["sample_rows"])
+
+
+def test_quarantine_invalid_rows_writes_rejected_rows():
+    conn = sqlite3.connect(":memory:")
+    df = pd.DataFrame({"sku_id": [1, -1], "sku_description": ["a", "b"], "price": [1.0, 2.0]})
+    valid = quarantine_invalid_rows(conn, df, "product", Model=Product)
+
+    assert list(valid["sku_id"]) == [1]
+    quarantined = pd.read_sql("SELECT * FROM product_quarantine", conn)
+    assert list(quarantined["sku_id"]) == [-1]
+    assert list(quarantined["source_row"]) == [1]
+    assert quarantined["rejection_reasons"].iloc[0] == "sku_id: Value error, sku_id must be positive"
+
+
+def test_collect_invalid_rows_rejects_values_not_fitting_int_column():
+    df = pd.DataFrame({
+        "sku_id": [1, 2, 3],
+        "order_id": ["O1", "O2", "O3"],
+        "sales": [2, 1.5, "abc"],
+        "orderdate_utc": ["2025-01-01"] * 3
+    })
+    valid, rejected, violations = collect_invalid_rows(df, schema=sales_schema, Model=SalesRecord)
+
+    assert list(valid["order_id"]) == ["O1"]
+    assert valid["sales"].dtype == "int64"
+    assert list(rejected["source_row"]) == [1, 2]
+    assert list(rejected["sales"]) == [1.5, "abc"]
+    assert violations == [{"rule": "dtype('int64')", "column": "sales", "count": 2, "sample_rows": [1, 2]}]